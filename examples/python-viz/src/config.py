@@ -5,7 +5,6 @@ NUM_PEERS = 4
 SIMULATION_DURATION_SECONDS = 1
 GOSSIP_INTERVAL_SECONDS = 0.1
 TRANSACTION_INTERVAL_SECONDS = 0.03
-LOOP_SLEEP_SECONDS = 0.005
 RANDOM_SEED = 0  # For reproducible simulation
 
 # Visualization
@@ -14,4 +13,6 @@ PEER_VIEWS_FILENAME = "images/hashgraph_peer_views.png"
 TIMELINE_FILENAME = "images/hashgraph_timeline.png"
 MERGED_GRAPH_FILENAME = "images/hashgraph_merged.png"
 DPI = 150
+MAX_PLOTTED_EVENTS = 2000  # Larger graphs are thinned along the time axis when plotted
+PARALLEL_RENDER_MIN_EVENTS = 5000  # Render images in worker processes once all graphs together plot this many events
 
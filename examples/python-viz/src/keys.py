@@ -3,43 +3,39 @@
 from cryptography.hazmat.primitives.asymmetric import ed25519
 from cryptography.hazmat.primitives import serialization
 
+# Raw serialization parameters, shared by every generated key
+_RAW_ENCODING = serialization.Encoding.Raw
+_RAW_PRIVATE_FORMAT = serialization.PrivateFormat.Raw
+_RAW_PUBLIC_FORMAT = serialization.PublicFormat.Raw
+_NO_ENCRYPTION = serialization.NoEncryption()
+
 
 def generate_keys(num_peers: int):
     """
     Generate Ed25519 key pairs for each peer.
-    
+
     Args:
         num_peers: Number of peers to generate keys for
-        
+
     Returns:
         tuple: (private_keys, public_keys) dictionaries mapping peer_id to bytes
     """
-    peers = list(range(num_peers))
-    keys = {
-        peer: ed25519.Ed25519PrivateKey.generate()
-        for peer in peers
-    }
-
-    private_keys = {
-        peer: key.private_bytes(
-            encoding=serialization.Encoding.Raw,
-            format=serialization.PrivateFormat.Raw,
-            encryption_algorithm=serialization.NoEncryption()
+    private_keys = {}
+    public_keys = {}
+    for peer in range(num_peers):
+        key = ed25519.Ed25519PrivateKey.generate()
+        private_keys[peer] = key.private_bytes(
+            encoding=_RAW_ENCODING,
+            format=_RAW_PRIVATE_FORMAT,
+            encryption_algorithm=_NO_ENCRYPTION
         )
-        for peer, key in keys.items()
-    }
-    
-    public_keys = {
-        peer: key.public_key().public_bytes(
-            encoding=serialization.Encoding.Raw,
-            format=serialization.PublicFormat.Raw
+        public_keys[peer] = key.public_key().public_bytes(
+            encoding=_RAW_ENCODING,
+            format=_RAW_PUBLIC_FORMAT
         )
-        for peer, key in keys.items()
-    }
 
     # Validate key sizes
     assert all(len(v) == 32 for v in private_keys.values())
     assert all(len(v) == 32 for v in public_keys.values())
-    
-    return private_keys, public_keys
 
+    return private_keys, public_keys
@@ -10,7 +10,7 @@ import visualization
 def main():
     """Main function to run the hashgraph simulation."""
     # Generate keys for all peers
-    peers = list(range(config.NUM_PEERS))
+    peers = range(config.NUM_PEERS)
     private_keys, public_keys = keys.generate_keys(config.NUM_PEERS)
     
     # Use the same initial timestamp for all peers so initial events have consistent ordering
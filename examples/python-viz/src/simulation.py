@@ -1,7 +1,9 @@
 """Hashgraph simulation logic."""
 
+import heapq
 import random
 import time
+from typing import Sequence
 from toy_hashgraph import Hashgraph
 import config
 
@@ -11,19 +13,23 @@ def current_timestamp_ms() -> int:
     return int(time.time() * 1000)
 
 
-def run_simulation(hashgraphs: dict, peers: list):
+def run_simulation(hashgraphs: dict, peers: Sequence[int]):
     """
     Run the hashgraph simulation.
     
     Args:
         hashgraphs: Dictionary mapping peer_id to Hashgraph instance
-        peers: List of peer IDs
+        peers: Sequence of peer IDs
         
     Returns:
         List of simulation events for ground truth visualization
     """
-    # Set random seed for reproducibility
-    random.seed(config.RANDOM_SEED)
+    # Use a private, seeded generator for reproducibility and bind its
+    # methods once for the main loop
+    rng = random.Random(config.RANDOM_SEED)
+    coin_flip = rng.getrandbits
+    choice = rng.choice
+    sample = rng.sample
     
     print(f"Starting simulation with {len(peers)} peers for {config.SIMULATION_DURATION_SECONDS} seconds...")
     print(f"- Gossiping between 2 random peers every {config.GOSSIP_INTERVAL_SECONDS} seconds")
@@ -32,21 +38,34 @@ def run_simulation(hashgraphs: dict, peers: list):
     print()
 
     # Use simulated time for deterministic results
-    simulated_time = 0.0
     base_timestamp_ms = current_timestamp_ms()  # Base timestamp for the hashgraph
-    last_gossip_time = 0.0
-    last_transaction_time = 0.0
     transaction_counter = 0
     
     # Track ground truth events
     simulation_events = []
 
-    while simulated_time < config.SIMULATION_DURATION_SECONDS:
+    # Schedule of upcoming actions as (time, priority, kind, occurrence).
+    # Each action's n-th occurrence happens at n * interval, so no rounding
+    # error accumulates; on ties transactions run before gossip.
+    intervals = {
+        "transaction": config.TRANSACTION_INTERVAL_SECONDS,
+        "gossip": config.GOSSIP_INTERVAL_SECONDS,
+    }
+    schedule = [
+        (config.TRANSACTION_INTERVAL_SECONDS, 0, "transaction", 1),
+        (config.GOSSIP_INTERVAL_SECONDS, 1, "gossip", 1),
+    ]
+    heapq.heapify(schedule)
+
+    # Jump straight from one scheduled action to the next
+    while schedule[0][0] < config.SIMULATION_DURATION_SECONDS:
+        simulated_time, priority, kind, occurrence = heapq.heappop(schedule)
+        heapq.heappush(schedule, (intervals[kind] * (occurrence + 1), priority, kind, occurrence + 1))
+
         # Every transaction interval, randomly decide whether to append a transaction
-        if simulated_time - last_transaction_time >= config.TRANSACTION_INTERVAL_SECONDS:
-            last_transaction_time = simulated_time
-            if random.choice([True, False]):
-                peer = random.choice(peers)
+        if kind == "transaction":
+            if coin_flip(1):
+                peer = choice(peers)
                 transaction_counter += 1
                 tx_data = f"tx_{transaction_counter}".encode()
                 hashgraphs[peer].append_transaction(tx_data)
@@ -60,16 +79,15 @@ def run_simulation(hashgraphs: dict, peers: list):
                 })
         
         # Every gossip interval, choose 2 random peers to gossip
-        if simulated_time - last_gossip_time >= config.GOSSIP_INTERVAL_SECONDS:
-            last_gossip_time = simulated_time
-            sender, receiver = random.sample(peers, 2)
+        elif kind == "gossip":
+            sender, receiver = sample(peers, 2)
             
             # Sender creates a message
             data = hashgraphs[sender].send()
             print(f"[{simulated_time:.3f}s] Peer {sender} -> Peer {receiver}: gossiping {len(data)} bytes")
             
             # Receiver processes the message with deterministic timestamp
-            event_timestamp_ms = base_timestamp_ms + int(simulated_time * 1000)
+            event_timestamp_ms = base_timestamp_ms + round(simulated_time * 1000)
             hashgraphs[receiver].receive(data, event_timestamp_ms)
             
             simulation_events.append({
@@ -78,9 +96,6 @@ def run_simulation(hashgraphs: dict, peers: list):
                 'receiver': receiver,
                 'time': simulated_time
             })
-        
-        # Advance simulated time
-        simulated_time += config.LOOP_SLEEP_SECONDS
 
     print()
     print("Simulation complete!")
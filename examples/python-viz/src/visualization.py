@@ -2,31 +2,63 @@
 
 import json
 import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Sequence
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import config
 
 
-def get_event_peer(graph: dict, event_hash: str) -> int:
+def get_event_peers(graph: dict) -> dict:
     """
-    Trace back through self_parent to find the peer that owns this event.
+    Map every event to the peer that owns it by following self_parent links.
+    
+    Each chain is walked only until it reaches an event whose owner is
+    already known, so the whole graph is resolved in a single pass.
     
     Args:
         graph: The hashgraph graph dictionary
-        event_hash: Hash of the event to trace
         
     Returns:
-        Peer ID that owns the event
+        Dictionary mapping event hash to the peer ID that owns the event
+    """
+    event_peers = {
+        event_hash: event["peer"]
+        for event_hash, event in graph.items()
+        if event["kind"] == "initial"
+    }
+    
+    for event_hash in graph:
+        # Climb self_parent links until reaching an event with a known owner
+        chain = []
+        current_hash = event_hash
+        while current_hash not in event_peers:
+            chain.append(current_hash)
+            current_hash = graph[current_hash]["self_parent"]
+        
+        peer = event_peers[current_hash]
+        for chain_hash in chain:
+            event_peers[chain_hash] = peer
+    
+    return event_peers
+
+
+def get_peer_lanes(peer_ids) -> dict:
+    """
+    Assign each peer the x coordinate of its lane.
+    
+    Args:
+        peer_ids: Iterable of peer IDs
+        
+    Returns:
+        Dictionary mapping peer ID to lane x coordinate, in sorted peer order
     """
-    current_hash = event_hash
-    while True:
-        event = graph[current_hash]
-        if event["kind"] == "initial":
-            return event["peer"]
-        else:
-            current_hash = event["self_parent"]
+    return {peer: i * 2 for i, peer in enumerate(sorted(peer_ids))}
 
 
-def plot_hashgraph(state: dict, title: str, ax, all_peers=None):
+def plot_hashgraph(state: dict, title: str, ax, peer_x: dict = None):
     """
     Plot a hashgraph on the given axes.
     
@@ -34,19 +66,16 @@ def plot_hashgraph(state: dict, title: str, ax, all_peers=None):
         state: Hashgraph state dictionary
         title: Title for the plot
         ax: Matplotlib axes to plot on
-        all_peers: Optional list of all peer IDs to show lanes for (even if no events)
+        peer_x: Optional lanes from get_peer_lanes to show (even if a peer has no
+            events); defaults to the peers with initial events in the graph
     """
     graph = state["graph"]["events"]
     
     # Get all unique peers by looking at initial events
-    if all_peers is not None:
-        peer_ids = sorted(all_peers)
-    else:
-        peer_ids = sorted(set(
+    if peer_x is None:
+        peer_x = get_peer_lanes(set(
             event["peer"] for event in graph.values() if event["kind"] == "initial"
         ))
-    peer_names = [f"Peer {p}" for p in peer_ids]
-    peer_x = {peer: i * 2 for i, peer in enumerate(peer_ids)}
     
     # Get min timestamp to normalize all events to start from 0
     if graph:
@@ -54,41 +83,50 @@ def plot_hashgraph(state: dict, title: str, ax, all_peers=None):
     else:
         min_timestamp = 0
     
-    # Assign y positions based on actual timestamp (normalized to start from 0)
-    event_positions = {}
-    max_y = 0
-    for event_hash, event in graph.items():
-        peer = get_event_peer(graph, event_hash)
-        x = peer_x[peer]
-        # Convert timestamp to relative time (in seconds)
-        y = (event["timestamp"] - min_timestamp) / 1000.0
-        event_positions[event_hash] = (x, y)
-        max_y = max(max_y, y)
-    
-    # Draw peer lanes (dashed vertical lines)
-    for peer, x in peer_x.items():
-        ax.axvline(x, color='gray', linestyle='--', alpha=0.3, zorder=0)
+    # Owners are resolved on the full graph, since self_parent chains may run
+    # through events that are thinned out below
+    event_peers = get_event_peers(graph)
+    
+    # Thin very large graphs to evenly spaced events along the time axis;
+    # edges are only drawn between events that are both kept
+    if len(graph) > config.MAX_PLOTTED_EVENTS:
+        by_time = sorted(graph, key=lambda event_hash: graph[event_hash]["timestamp"])
+        stride = -(-len(by_time) // config.MAX_PLOTTED_EVENTS)
+        graph = {event_hash: graph[event_hash] for event_hash in by_time[::stride]}
+        title = f"{title}\nshowing {len(graph)} of {len(by_time)} events"
+    
+    # Lay events out as parallel coordinate arrays, indexed by position in the graph
+    event_hashes = list(graph)
+    hash_to_index = {event_hash: i for i, event_hash in enumerate(event_hashes)}
+    xs = np.array([peer_x[event_peers[event_hash]] for event_hash in event_hashes], dtype=float)
+    # Convert timestamps to relative time (in seconds)
+    timestamps = np.array([event["timestamp"] for event in graph.values()], dtype=np.int64)
+    ys = (timestamps - min_timestamp) / 1000.0
+    max_y = float(ys.max()) if len(ys) else 0
     
-    # Draw edges first (so they're behind nodes)
-    for event_hash, event in graph.items():
+    # Draw peer lanes (dashed vertical lines spanning the full axes height)
+    ax.vlines(list(peer_x.values()), 0, 1, transform=ax.get_xaxis_transform(),
+              colors='gray', linestyles='--', alpha=0.3, zorder=0)
+    
+    # Draw edges first (so they're behind nodes), as a single collection
+    children = []
+    parents = []
+    for i, event in enumerate(graph.values()):
         if event["kind"] == "default":
-            x1, y1 = event_positions[event_hash]
-            
-            # Self parent edge
-            if event["self_parent"] in event_positions:
-                x2, y2 = event_positions[event["self_parent"]]
-                ax.plot([x1, x2], [y1, y2], 'k-', linewidth=1, zorder=1)
-            
-            # Other parent edge
-            if event["other_parent"] in event_positions:
-                x2, y2 = event_positions[event["other_parent"]]
-                ax.plot([x1, x2], [y1, y2], 'k-', linewidth=1, zorder=1)
-    
-    # Draw events as circles using scatter (maintains circular shape)
-    for event_hash, (x, y) in event_positions.items():
-        ax.scatter(x, y, s=400, c='white', edgecolors='black', 
-                  linewidths=1.5, zorder=2, marker='o')
-        
+            for parent in (event["self_parent"], event["other_parent"]):
+                j = hash_to_index.get(parent)
+                if j is not None:
+                    children.append(i)
+                    parents.append(j)
+    points = np.column_stack([xs, ys])
+    segments = np.stack([points[children], points[parents]], axis=1)
+    ax.add_collection(LineCollection(segments, colors='k', linewidths=1, zorder=1))
+    
+    # Draw all events as circles with one scatter call (maintains circular shape)
+    ax.scatter(xs, ys, s=400, c='white', edgecolors='black',
+              linewidths=1.5, zorder=2, marker='o')
+    
+    for event_hash, x, y in zip(event_hashes, xs, ys):
         # Label with short hash in monospace font
         short_hash = event_hash[:4]
         ax.text(x, y, short_hash, ha='center', va='center', fontsize=7, 
@@ -111,13 +149,13 @@ def plot_hashgraph(state: dict, title: str, ax, all_peers=None):
     ax.grid(True, axis='y', alpha=0.2, linestyle='-', linewidth=0.5)
 
 
-def plot_ground_truth(simulation_events: list, peers: list, ax):
+def plot_ground_truth(simulation_events: list, peers: Sequence[int], ax):
     """
     Plot the ground truth simulation timeline.
     
     Args:
         simulation_events: List of simulation events
-        peers: List of peer IDs
+        peers: Sequence of peer IDs
         ax: Matplotlib axes to plot on
     """
     # Spacing between peers
@@ -126,64 +164,55 @@ def plot_ground_truth(simulation_events: list, peers: list, ax):
     # Calculate time range
     max_time = max(e['time'] for e in simulation_events) if simulation_events else 1
     
-    # Group transactions that are very close in time on the same peer
-    transaction_positions = {}
+    # Spread out transactions that are very close in time on the same peer
+    transactions_by_peer = defaultdict(list)
     spacing_threshold = 0.02  # 20ms
     
     for event in simulation_events:
         if event['type'] == 'transaction':
-            peer = event['peer']
-            time = event['time']
-            
-            # Check if there's a nearby transaction on the same peer
-            adjusted_time = time
-            if peer in transaction_positions:
-                for existing_time in transaction_positions[peer]:
-                    if abs(time - existing_time) < spacing_threshold:
-                        # Offset this transaction slightly
-                        adjusted_time = existing_time + spacing_threshold
-                        break
-            
-            if peer not in transaction_positions:
-                transaction_positions[peer] = []
-            transaction_positions[peer].append(adjusted_time)
-            event['adjusted_time'] = adjusted_time
+            transactions_by_peer[event['peer']].append(event)
+    
+    for transactions in transactions_by_peer.values():
+        # In time order, each transaction is placed at least spacing_threshold
+        # after the previous one: a[i] = max(t[i], a[i-1] + spacing), which
+        # unrolls to a running maximum of t[i] - i * spacing
+        times = np.array([event['time'] for event in transactions])
+        order = np.argsort(times, kind='stable')
+        offsets = np.arange(len(order)) * spacing_threshold
+        adjusted_times = offsets + np.maximum.accumulate(times[order] - offsets)
+        for i, adjusted_time in zip(order, adjusted_times):
+            transactions[i]['adjusted_time'] = float(adjusted_time)
     
     # Draw peer lanes
-    for peer, x in peer_x.items():
-        ax.axvline(x, color='gray', linestyle='--', alpha=0.3, linewidth=1, zorder=0)
+    ax.vlines(list(peer_x.values()), 0, 1, transform=ax.get_xaxis_transform(),
+              colors='gray', linestyles='--', alpha=0.3, linewidth=1, zorder=0)
     
-    # Plot gossip arrows first (so they're behind transactions)
-    for event in simulation_events:
-        if event['type'] == 'gossip':
-            sender = event['sender']
-            receiver = event['receiver']
-            x1, x2 = peer_x[sender], peer_x[receiver]
-            y = event['time']
-            
-            # Draw gossip as an arrow
-            ax.annotate('', xy=(x2, y), xytext=(x1, y),
-                       arrowprops=dict(arrowstyle='->', lw=1.5, color='royalblue', 
-                                     alpha=0.5, shrinkA=0, shrinkB=0),
-                       zorder=1)
+    # Plot gossip arrows first (so they're behind transactions), as one quiver
+    gossips = [event for event in simulation_events if event['type'] == 'gossip']
+    if gossips:
+        senders_x = np.array([peer_x[event['sender']] for event in gossips], dtype=float)
+        receivers_x = np.array([peer_x[event['receiver']] for event in gossips], dtype=float)
+        gossip_times = np.array([event['time'] for event in gossips], dtype=float)
+        ax.quiver(senders_x, gossip_times, receivers_x - senders_x, np.zeros(len(gossips)),
+                  angles='xy', scale_units='xy', scale=1, color='royalblue', alpha=0.5,
+                  width=0.003, headwidth=4, headlength=5, headaxislength=4.5, zorder=1)
     
     # Plot transactions on top
-    for event in simulation_events:
-        if event['type'] == 'transaction':
-            peer = event['peer']
-            x = peer_x[peer]
-            y = event.get('adjusted_time', event['time'])
-            
-            # Draw transaction as a scatter point (guaranteed to be circular)
-            ax.scatter(x, y, s=300, c='orange', edgecolors='black', 
-                      linewidths=1.5, zorder=3, marker='o')
-            
-            # Extract transaction number
-            tx_num = event['transaction'].replace('tx_', '')
-            
-            # Label with transaction number inside the circle
-            ax.text(x, y, tx_num, ha='center', va='center', 
-                   fontsize=7, fontweight='bold', zorder=4)
+    transactions = [event for event in simulation_events if event['type'] == 'transaction']
+    tx_xs = [peer_x[event['peer']] for event in transactions]
+    tx_ys = [event.get('adjusted_time', event['time']) for event in transactions]
+    
+    # Draw all transactions with one scatter call (guaranteed to be circular)
+    ax.scatter(tx_xs, tx_ys, s=300, c='orange', edgecolors='black', 
+              linewidths=1.5, zorder=3, marker='o')
+    
+    for event, x, y in zip(transactions, tx_xs, tx_ys):
+        # Extract transaction number
+        tx_num = event['transaction'].replace('tx_', '')
+        
+        # Label with transaction number inside the circle
+        ax.text(x, y, tx_num, ha='center', va='center', 
+               fontsize=7, fontweight='bold', zorder=4)
     
     # Add peer labels at bottom
     for peer, x in peer_x.items():
@@ -202,13 +231,13 @@ def plot_ground_truth(simulation_events: list, peers: list, ax):
     ax.spines['bottom'].set_visible(False)
 
 
-def merge_all_graphs(hashgraphs: dict, peers: list) -> dict:
+def merge_all_graphs(states: dict, peers: Sequence[int]) -> dict:
     """
     Merge all peer hashgraphs into a single global graph.
     
     Args:
-        hashgraphs: Dictionary mapping peer_id to Hashgraph instance
-        peers: List of peer IDs
+        states: Dictionary mapping peer_id to parsed Hashgraph state
+        peers: Sequence of peer IDs
         
     Returns:
         Merged state dictionary with all unique events
@@ -217,52 +246,57 @@ def merge_all_graphs(hashgraphs: dict, peers: list) -> dict:
     total_peers = 0
     
     for peer in peers:
-        state = json.loads(hashgraphs[peer].as_json())
-        graph_data = state["graph"]
+        graph_data = states[peer]["graph"]
         total_peers = graph_data["total_peers"]
         events = graph_data["events"]
         
-        # Add all events from this peer's view
-        for event_hash, event in events.items():
-            if event_hash not in merged_graph:
-                merged_graph[event_hash] = event
+        # Add all events from this peer's view. Events are keyed by their
+        # content hash, so an event seen by several peers is identical in
+        # each view and overwriting it is harmless.
+        merged_graph.update(events)
     
     return {"graph": {"total_peers": total_peers, "events": merged_graph}}
 
 
-def visualize_hashgraphs(hashgraphs: dict, peers: list, simulation_events: list = None):
+def save_timeline(simulation_events: list, peers: Sequence[int]):
     """
-    Create and save visualization of all peer hashgraphs.
+    Render the ground truth timeline and save it to TIMELINE_FILENAME.
     
     Args:
-        hashgraphs: Dictionary mapping peer_id to Hashgraph instance
-        peers: List of peer IDs
-        simulation_events: Optional list of simulation events for ground truth plot
+        simulation_events: List of simulation events
+        peers: Sequence of peer IDs
     """
-    # Create output directory if it doesn't exist
-    os.makedirs(config.OUTPUT_DIR, exist_ok=True)
+    fig_timeline = plt.figure(figsize=(8, 6))
+    ax_timeline = fig_timeline.add_subplot(111)
+    plot_ground_truth(simulation_events, peers, ax_timeline)
+    plt.savefig(config.TIMELINE_FILENAME, dpi=config.DPI, bbox_inches='tight')
+    plt.close(fig_timeline)
+
+
+def save_merged_graph(merged_state: dict, peer_x: dict):
+    """
+    Render the merged graph and save it to MERGED_GRAPH_FILENAME.
     
-    # Save timeline separately if available
-    if simulation_events:
-        fig_timeline = plt.figure(figsize=(8, 6))
-        ax_timeline = fig_timeline.add_subplot(111)
-        plot_ground_truth(simulation_events, peers, ax_timeline)
-        plt.tight_layout()
-        plt.savefig(config.TIMELINE_FILENAME, dpi=config.DPI, bbox_inches='tight')
-        print(f"Saved timeline to {config.TIMELINE_FILENAME}")
-        plt.close(fig_timeline)
-    
-    # Create merged graph from all peer views
-    merged_state = merge_all_graphs(hashgraphs, peers)
+    Args:
+        merged_state: Merged state dictionary from merge_all_graphs
+        peer_x: Peer lanes from get_peer_lanes
+    """
     fig_merged = plt.figure(figsize=(10, 8))
     ax_merged = fig_merged.add_subplot(111)
-    plot_hashgraph(merged_state, f"Merged Graph ({len(merged_state['graph'])} events)", ax_merged, all_peers=peers)
-    plt.tight_layout()
+    plot_hashgraph(merged_state, f"Merged Graph ({len(merged_state['graph']['events'])} events)", ax_merged, peer_x=peer_x)
     plt.savefig(config.MERGED_GRAPH_FILENAME, dpi=config.DPI, bbox_inches='tight')
-    print(f"Saved merged graph to {config.MERGED_GRAPH_FILENAME}")
     plt.close(fig_merged)
+
+
+def save_peer_views(states: dict, peers: Sequence[int], peer_x: dict):
+    """
+    Render every peer's view in a 2x2 grid and save it to PEER_VIEWS_FILENAME.
     
-    # Create a 2x2 grid for peer views
+    Args:
+        states: Dictionary mapping peer_id to parsed Hashgraph state
+        peers: Sequence of peer IDs
+        peer_x: Peer lanes from get_peer_lanes, shared by every view
+    """
     num_peers = len(peers)
     rows = 2
     cols = 2
@@ -273,15 +307,62 @@ def visualize_hashgraphs(hashgraphs: dict, peers: list, simulation_events: list
     # Plot each peer's view (showing all peer lanes)
     for i, peer in enumerate(peers):
         if i < len(axes):
-            state = json.loads(hashgraphs[peer].as_json())
-            plot_hashgraph(state, f"Peer {peer}'s View ({len(state['graph'])} events)", axes[i], all_peers=peers)
+            state = states[peer]
+            plot_hashgraph(state, f"Peer {peer}'s View ({len(state['graph']['events'])} events)", axes[i], peer_x=peer_x)
     
     # Hide any unused subplots
     for i in range(num_peers, len(axes)):
         axes[i].axis('off')
 
-    plt.tight_layout()
     plt.savefig(config.PEER_VIEWS_FILENAME, dpi=config.DPI, bbox_inches='tight')
-    print(f"Saved peer views to {config.PEER_VIEWS_FILENAME}")
     plt.close(fig)
 
+
+def visualize_hashgraphs(hashgraphs: dict, peers: Sequence[int], simulation_events: list = None):
+    """
+    Create and save visualization of all peer hashgraphs.
+    
+    Small graphs are rendered in-process. Once the merged graph and the peer
+    views together plot at least PARALLEL_RENDER_MIN_EVENTS events, each
+    output image is rendered in its own worker process instead, since
+    Matplotlib rendering is CPU-bound and holds the GIL; below that, starting
+    workers (which re-import Matplotlib under spawn/forkserver) costs more
+    than drawing.
+    
+    Args:
+        hashgraphs: Dictionary mapping peer_id to Hashgraph instance
+        peers: Sequence of peer IDs
+        simulation_events: Optional list of simulation events for ground truth plot
+    """
+    # Create output directory if it doesn't exist
+    os.makedirs(config.OUTPUT_DIR, exist_ok=True)
+    
+    # Parse each peer's state once; the plain dictionaries are shared by the
+    # merged graph and the peer views, and can be sent to worker processes
+    states = {peer: json.loads(hashgraphs[peer].as_json()) for peer in peers}
+    merged_state = merge_all_graphs(states, peers)
+    peer_x = get_peer_lanes(peers)
+    
+    jobs = []
+    if simulation_events:
+        jobs.append((save_timeline, (simulation_events, peers), f"timeline to {config.TIMELINE_FILENAME}"))
+    jobs.append((save_merged_graph, (merged_state, peer_x), f"merged graph to {config.MERGED_GRAPH_FILENAME}"))
+    jobs.append((save_peer_views, (states, peers, peer_x), f"peer views to {config.PEER_VIEWS_FILENAME}"))
+    
+    # plot_hashgraph thins every graph to at most MAX_PLOTTED_EVENTS, so that
+    # is the most any one graph can cost to draw
+    plotted_events = sum(
+        min(len(state["graph"]["events"]), config.MAX_PLOTTED_EVENTS)
+        for state in [merged_state, *states.values()]
+    )
+    if plotted_events < config.PARALLEL_RENDER_MIN_EVENTS or (os.cpu_count() or 1) < 2:
+        for job, args, description in jobs:
+            job(*args)
+            print(f"Saved {description}")
+        return
+    
+    with ProcessPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = [(executor.submit(job, *args), description) for job, args, description in jobs]
+        for future, description in futures:
+            future.result()
+            print(f"Saved {description}")